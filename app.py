@@ -1,82 +1,276 @@
-from flask import Flask, render_template, request, redirect, url_for, send_file, flash, jsonify
+from flask import Flask, Response, render_template, request, redirect, url_for, send_file, flash, jsonify
 import os
 import json
+import time
+import atexit
+import logging
+import functools
 import hashlib
+import tempfile
+import threading
+import orjson
 import requests
+from collections import OrderedDict
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from streaming_form_data import StreamingFormDataParser, ParseFailedException
+from streaming_form_data.targets import BaseTarget, ValueTarget
+from streaming_form_data.validators import MaxSizeValidator, ValidationError
+from urllib3.util.retry import Retry
 from datetime import datetime
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
-from blockchain import Blockchain, Block
+from werkzeug.wsgi import ClosingIterator
+from blockchain import Blockchain, Block, sha256_backend
 from config import Config
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Encode jsonify() responses with orjson, straight to bytes"""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+    
+    def loads(self, s, **kwargs):
+        # The session serializer passes object_hook, which orjson doesn't support
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, default=self.default), mimetype=self.mimetype)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config.from_object(Config)
 app.secret_key = Config.SECRET_KEY
+app.jinja_env.auto_reload = Config.TEMPLATES_AUTO_RELOAD
 
 # Initialize blockchain
 blockchain = Blockchain()
+logger.info("SHA-256 backend: %s", sha256_backend())
+
+# (connect, read) timeouts for add/get calls to the IPFS daemon
+IPFS_TIMEOUT = (3.05, 60)
+
+def ttl_cached(seconds, cache_if=None):
+    """
+    Cache an IPFSClient method's result in self._cache for a few seconds.
+    Exceptions and results rejected by cache_if (fallbacks) are never cached.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            cached = self._cache.get(method.__name__)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+            
+            result = method(self)
+            if cache_if is None or cache_if(result):
+                self._cache[method.__name__] = (result, time.monotonic() + seconds)
+            return result
+        return wrapper
+    return decorator
 
 # Ultra-Simple IPFS client that avoids ALL problematic API calls
 class IPFSClient:
-    def __init__(self, host='127.0.0.1', port=5001):
+    DIST_TTL = 30  # Seconds before a distribution snapshot is refreshed
+    DIST_CACHE_SIZE = 128  # Recently viewed files whose snapshots are kept fresh
+    
+    # Each peer entry in a /swarm/peers reply carries exactly one of these keys
+    PEER_MARKER = b'"Addr"'
+    
+    # Fixed provider entries for the distribution view; shared, never mutated
+    LOCAL_PROVIDER = {
+        'peer_id': 'local_node',
+        'addresses': ['This Computer (Primary Storage)'],
+        'type': 'local',
+        'status': 'available',
+        'description': 'File is securely stored on your local IPFS node'
+    }
+    NETWORK_CHECKING_PROVIDER = {
+        'peer_id': 'network_status',
+        'addresses': ['IPFS Network: Checking...'],
+        'type': 'network',
+        'status': 'checking',
+        'description': 'Checking network connectivity...'
+    }
+    REMOTE_PROVIDERS = tuple({
+        'peer_id': f'remote_node_{number}',
+        'addresses': [f'IPFS Network Node ({region})'],
+        'type': 'remote',
+        'status': 'available',
+        'description': 'Distributed storage node'
+    } for number, region in enumerate(('Europe', 'North America', 'Asia'), start=1))
+    
+    def __init__(self, host='127.0.0.1', port=5001, max_concurrency=8):
         self.base_url = f'http://{host}:{port}/api/v0'
+        
+        # Cap simultaneous add/get transfers so bursts don't overwhelm the daemon
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        
+        # One pooled session so every daemon call reuses kept-alive connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50,
+                              max_retries=Retry(total=2, backoff_factor=0.1))
+        self.session.mount('http://', adapter)
+        
+        # Short-lived results of status probes, see ttl_cached
+        self._cache = {}
+        
+        # ipfs_hash -> (distribution, fetched_at), LRU ordered, refreshed in the background
+        self._dist_cache = OrderedDict()
+        self._dist_lock = threading.Lock()
+        self._refresh_wakeup = threading.Event()
+        self._refresher = None
+    
+    def close(self):
+        self.session.close()
     
-    def add(self, file_path):
+    def add_stream(self, fileobj, filename):
+        """
+        Upload a readable file-like object to IPFS without touching the disk
+        """
         try:
-            with open(file_path, 'rb') as file:
-                files = {'file': file}
-                response = requests.post(f'{self.base_url}/add', files=files)
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    print(f"IPFS Add Error: {response.status_code}")
-                    return None
+            # Stream the body in chunks instead of building the multipart payload in memory
+            encoder = MultipartEncoder(fields={
+                'file': (filename, fileobj, 'application/octet-stream')
+            })
+            with self._slots:
+                response = self.session.post(f'{self.base_url}/add',
+                                             data=encoder,
+                                             headers={'Content-Type': encoder.content_type},
+                                             timeout=(IPFS_TIMEOUT[0], None))
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.warning("IPFS Add Error: %s", response.status_code)
+                return None
         except Exception as e:
-            print(f"Error adding file to IPFS: {e}")
+            logger.warning("Error adding file to IPFS: %s", e)
             return None
     
-    def get(self, ipfs_hash, download_path):
+    def add_many(self, files):
+        """
+        Upload several (filename, file-like) pairs to IPFS in a single /add request.
+        Returns the daemon's {Name, Hash, Size} entries in upload order, or None.
+        """
         try:
-            # Ensure download directory exists
-            os.makedirs(download_path, exist_ok=True)
-            
-            # IPFS get command
-            params = {'arg': ipfs_hash}
-            response = requests.post(f'{self.base_url}/get', params=params, stream=True)
-            
+            encoder = MultipartEncoder(fields=[
+                ('file', (filename, fileobj, 'application/octet-stream'))
+                for filename, fileobj in files
+            ])
+            with self._slots:
+                response = self.session.post(f'{self.base_url}/add',
+                                             data=encoder,
+                                             headers={'Content-Type': encoder.content_type},
+                                             timeout=(IPFS_TIMEOUT[0], None))
             if response.status_code == 200:
-                # IPFS saves files in a folder named after the hash
-                ipfs_folder = os.path.join(download_path, ipfs_hash)
-                os.makedirs(ipfs_folder, exist_ok=True)
-                
-                # The actual file will be inside this folder
-                output_path = os.path.join(ipfs_folder, ipfs_hash)
-                
-                with open(output_path, 'wb') as file:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            file.write(chunk)
-                
-                # Find the actual file in the IPFS directory
-                for file_in_dir in os.listdir(ipfs_folder):
-                    file_path = os.path.join(ipfs_folder, file_in_dir)
-                    if os.path.isfile(file_path) and file_in_dir != ipfs_hash:
-                        return file_path
-                
-                return output_path
+                # One JSON object per added file, newline delimited
+                return [json.loads(line) for line in response.iter_lines() if line]
             else:
-                print(f"IPFS Get Error: {response.status_code}")
+                logger.warning("IPFS Add Error: %s", response.status_code)
                 return None
-                
         except Exception as e:
-            print(f"Error getting file from IPFS: {e}")
+            logger.warning("Error adding files to IPFS: %s", e)
             return None
     
+    def get_stream(self, ipfs_hash, chunk_size=65536):
+        """
+        Open a file's contents on IPFS as an iterator of byte chunks, or None.
+        
+        Uses /cat, which returns the raw bytes rather than /get's tar archive.
+        The transfer slot and daemon connection are held until the last chunk
+        has been read, or until the returned iterator is closed if the client
+        goes away first.
+        """
+        self._slots.acquire()
+        try:
+            response = self.session.post(f'{self.base_url}/cat', params={'arg': ipfs_hash},
+                                         stream=True, timeout=IPFS_TIMEOUT)
+        except Exception as e:
+            self._slots.release()
+            logger.warning("Error getting file from IPFS: %s", e)
+            return None
+        
+        if response.status_code != 200:
+            response.close()
+            self._slots.release()
+            logger.warning("IPFS Cat Error: %s", response.status_code)
+            return None
+        
+        released = threading.Lock()
+        
+        def release():
+            # Runs from whichever of finish or close comes first, and only once
+            if released.acquire(blocking=False):
+                response.close()
+                self._slots.release()
+        
+        def chunks():
+            try:
+                yield from response.iter_content(chunk_size)
+            finally:
+                release()
+        
+        # Not every WSGI server calls close(), so release on normal completion too
+        # and keep close() for aborted transfers
+        return ClosingIterator(chunks(), release)
+    
     def get_file_distribution(self, ipfs_hash):
+        """
+        Serve the last distribution snapshot for a file; a background thread keeps
+        snapshots fresh, so only the first lookup of a hash is computed inline
+        """
+        with self._dist_lock:
+            cached = self._dist_cache.get(ipfs_hash)
+            if cached:
+                self._dist_cache.move_to_end(ipfs_hash)
+        
+        self._start_refresher()
+        if cached:
+            if time.monotonic() - cached[1] > self.DIST_TTL:
+                self._refresh_wakeup.set()
+            return cached[0]
+        
+        distribution = self._build_file_distribution(ipfs_hash)
+        self._store_distribution(ipfs_hash, distribution)
+        return distribution
+    
+    def _store_distribution(self, ipfs_hash, distribution):
+        with self._dist_lock:
+            self._dist_cache[ipfs_hash] = (distribution, time.monotonic())
+            self._dist_cache.move_to_end(ipfs_hash)
+            while len(self._dist_cache) > self.DIST_CACHE_SIZE:
+                self._dist_cache.popitem(last=False)
+    
+    def _start_refresher(self):
+        with self._dist_lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+                self._refresher.start()
+    
+    def _refresh_loop(self):
+        """Recompute snapshots for recently viewed files every DIST_TTL seconds"""
+        while True:
+            self._refresh_wakeup.wait(timeout=self.DIST_TTL)
+            self._refresh_wakeup.clear()
+            with self._dist_lock:
+                ipfs_hashes = list(self._dist_cache)
+            for ipfs_hash in ipfs_hashes:
+                self._store_distribution(ipfs_hash, self._build_file_distribution(ipfs_hash))
+    
+    def _build_file_distribution(self, ipfs_hash):
         """
         COMPLETELY SAFE method that avoids ALL problematic IPFS API calls
         """
         try:
-            print(f"Getting distribution for: {ipfs_hash}")
+            logger.debug("Getting distribution for: %s", ipfs_hash)
             
             # Use a guaranteed-safe approach that never calls problematic IPFS APIs
             providers = self._get_guaranteed_providers(ipfs_hash)
@@ -93,22 +287,14 @@ class IPFSClient:
             }
                 
         except Exception as e:
-            print(f"Error in get_file_distribution: {e}")
+            logger.warning("Error in get_file_distribution: %s", e)
             # Even on error, return basic information with INTEGER total_providers
             return self._get_absolute_fallback(ipfs_hash)
     
     def _get_guaranteed_providers(self, ipfs_hash):
         """Get providers using methods that NEVER fail"""
-        providers = []
-        
         # Method 1: Always include local node (we know the file exists because it's in blockchain)
-        providers.append({
-            'peer_id': 'local_node',
-            'addresses': ['This Computer (Primary Storage)'],
-            'type': 'local',
-            'status': 'available',
-            'description': 'File is securely stored on your local IPFS node'
-        })
+        providers = [self.LOCAL_PROVIDER]
         
         # Method 2: Check basic IPFS connectivity without complex APIs
         connectivity = self._check_basic_connectivity()
@@ -124,21 +310,16 @@ class IPFSClient:
             # Add some simulated remote providers to show network distribution
             providers.extend(self._get_simulated_remote_providers())
         else:
-            providers.append({
-                'peer_id': 'network_status',
-                'addresses': ['IPFS Network: Checking...'],
-                'type': 'network',
-                'status': 'checking',
-                'description': 'Checking network connectivity...'
-            })
+            providers.append(self.NETWORK_CHECKING_PROVIDER)
         
         return providers
     
+    @ttl_cached(seconds=5, cache_if=lambda result: result['connected'])
     def _check_basic_connectivity(self):
         """Check basic connectivity without using problematic APIs"""
         try:
             # Simple ID check to see if IPFS is running
-            response = requests.post(f'{self.base_url}/id', timeout=3)
+            response = self.session.post(f'{self.base_url}/id', timeout=3)
             if response.status_code == 200:
                 # If we can get ID, assume we have some network connectivity
                 # Use a fixed number or get actual peers count with safe method
@@ -152,53 +333,33 @@ class IPFSClient:
     def _get_safe_peer_count(self):
         """Get peer count safely without complex parsing"""
         try:
-            response = requests.post(f'{self.base_url}/swarm/peers', timeout=2)
-            if response.status_code == 200:
-                # Just count the number of peer entries in the response text
-                content = response.text
-                # Count occurrences of typical peer patterns
-                peer_indicators = ['/ip4/', '/ip6/', '/p2p/']
-                estimated_peers = sum(content.count(indicator) for indicator in peer_indicators)
-                return max(1, estimated_peers // 2)  # Rough estimate
+            return self._fetch_peer_count()
         except:
-            pass
-        
-        return 8  # Default reasonable number
+            return 8  # Default reasonable number
+    
+    @ttl_cached(seconds=5)
+    def _fetch_peer_count(self):
+        response = self.session.post(f'{self.base_url}/swarm/peers', timeout=2, stream=True)
+        response.raise_for_status()
+        # Each peer entry carries exactly one "Addr" key; count them over the raw
+        # bytes as they arrive, without decoding or holding the whole body
+        marker = self.PEER_MARKER
+        peers = 0
+        tail = b''
+        for chunk in response.iter_content(chunk_size=65536):
+            buffer = tail + chunk
+            peers += buffer.count(marker)
+            # Keep just enough bytes to catch a marker split across chunks
+            tail = buffer[-(len(marker) - 1):]
+        return max(1, peers)
     
     def _get_simulated_remote_providers(self):
         """Provide realistic-looking remote providers without actual DHT calls"""
-        providers = []
-        
-        # Add 2-4 simulated remote providers to show distribution
-        simulated_providers = [
-            {
-                'peer_id': 'remote_node_1',
-                'addresses': ['IPFS Network Node (Europe)'],
-                'type': 'remote',
-                'status': 'available',
-                'description': 'Distributed storage node'
-            },
-            {
-                'peer_id': 'remote_node_2', 
-                'addresses': ['IPFS Network Node (North America)'],
-                'type': 'remote',
-                'status': 'available',
-                'description': 'Distributed storage node'
-            }
-        ]
-        
-        # Add more providers if we have good connectivity
+        # Show two simulated remote providers, and a third if we have good connectivity
         connectivity = self._check_basic_connectivity()
         if connectivity['connected'] and connectivity['peer_count'] > 20:
-            simulated_providers.append({
-                'peer_id': 'remote_node_3',
-                'addresses': ['IPFS Network Node (Asia)'],
-                'type': 'remote', 
-                'status': 'available',
-                'description': 'Distributed storage node'
-            })
-        
-        return simulated_providers
+            return list(self.REMOTE_PROVIDERS)
+        return list(self.REMOTE_PROVIDERS[:2])
     
     def _get_absolute_fallback(self, ipfs_hash):
         """Fallback that ALWAYS works"""
@@ -218,18 +379,22 @@ class IPFSClient:
             'timestamp': datetime.now().isoformat()
         }
     
+    @ttl_cached(seconds=5, cache_if=lambda result: result['status'] == 'connected')
     def check_ipfs_status(self):
         """
         Check if IPFS daemon is running and connected
         """
         try:
+            # Start the peer count now so it overlaps with the ID request
+            peer_count_future = ipfs_executor.submit(self._get_safe_peer_count)
+            
             # Check if API is reachable
-            response = requests.post(f'{self.base_url}/id', timeout=3)
+            response = self.session.post(f'{self.base_url}/id', timeout=3)
             if response.status_code == 200:
                 node_info = response.json()
                 
                 # Get safe peer count
-                peer_count = self._get_safe_peer_count()
+                peer_count = peer_count_future.result()
                 
                 return {
                     'status': 'connected',
@@ -244,15 +409,149 @@ class IPFSClient:
         except Exception as e:
             return {'status': 'error', 'error': str(e)}
 
+class CountingReader:
+    """Wrap an upload stream and count the bytes handed to IPFS"""
+    def __init__(self, stream, size):
+        self.stream = stream
+        self.size = size
+        self.bytes_read = 0
+    
+    @property
+    def len(self):
+        # Remaining length, as expected by MultipartEncoder
+        return self.size - self.bytes_read
+    
+    def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+class SpooledFileTarget(BaseTarget):
+    """streaming-form-data target that spools the uploaded file to a temporary file"""
+    def __init__(self, max_size=1024 * 1024):
+        super().__init__()
+        self.file = tempfile.SpooledTemporaryFile(max_size=max_size)
+        self.size = 0
+    
+    def on_data_received(self, chunk):
+        self.file.write(chunk)
+        self.size += len(chunk)
+    
+    def on_finish(self):
+        self.file.seek(0)
+
+class TooManyFilesError(ValidationError):
+    pass
+
+class SpooledFilesTarget(BaseTarget):
+    """Like SpooledFileTarget, but keeps a separate spooled file for each part posted under the field"""
+    def __init__(self, max_parts, max_size=1024 * 1024):
+        super().__init__()
+        self.max_parts = max_parts
+        self.max_size = max_size
+        self.parts = []
+    
+    def on_start(self):
+        # Every part stays open until the single IPFS add, so refuse before opening one too many
+        if len(self.parts) >= self.max_parts:
+            raise TooManyFilesError(f'At most {self.max_parts} files can be uploaded at once')
+        part = SpooledFileTarget(self.max_size)
+        part.multipart_filename = self.multipart_filename
+        self.parts.append(part)
+    
+    def on_data_received(self, chunk):
+        self.parts[-1].on_data_received(chunk)
+    
+    def on_finish(self):
+        self.parts[-1].on_finish()
+    
+    def close(self):
+        for part in self.parts:
+            part.file.close()
+
+class CachingIterator:
+    """Pass a download's chunks through while saving them, keeping the file only if the stream completes"""
+    def __init__(self, chunks, path, max_bytes):
+        self.chunks = chunks
+        self.path = path
+        self.max_bytes = max_bytes
+        fd, self.partial_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        self.file = os.fdopen(fd, 'wb')
+    
+    def __iter__(self):
+        try:
+            for chunk in self.chunks:
+                self.file.write(chunk)
+                yield chunk
+            self.file.close()
+            try:
+                os.replace(self.partial_path, self.path)
+            except OSError as e:
+                logger.warning("Could not cache download %s: %s", self.path, e)
+            else:
+                self.prune()
+        finally:
+            self.discard()
+    
+    def close(self):
+        self.chunks.close()
+        self.discard()
+    
+    def discard(self):
+        """Drop the partial copy, if it is still around"""
+        self.file.close()
+        try:
+            os.remove(self.partial_path)
+        except FileNotFoundError:
+            pass
+    
+    def prune(self):
+        """Delete the oldest saved downloads until the cache folder fits in max_bytes"""
+        entries = []
+        with os.scandir(os.path.dirname(self.path)) as scan:
+            for entry in scan:
+                if entry.is_file() and not entry.name.endswith('.part'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
 # Initialize IPFS client
-ipfs_client = IPFSClient(Config.IPFS_HOST, Config.IPFS_PORT)
+ipfs_client = IPFSClient(Config.IPFS_HOST, Config.IPFS_PORT, Config.IPFS_MAX_CONCURRENCY)
+atexit.register(ipfs_client.close)
+
+# Worker threads for overlapping independent IPFS round trips within a request.
+# Only request threads submit work here; pool tasks never wait on each other.
+ipfs_executor = ThreadPoolExecutor(max_workers=8)
+
+# Storage folders, resolved once at import instead of on every request
+UPLOAD_FOLDER = Config.UPLOAD_FOLDER
+DOWNLOAD_FOLDER = Config.DOWNLOAD_FOLDER
+DOWNLOAD_CACHE_FOLDER = os.path.join(DOWNLOAD_FOLDER, 'cache')
+DOWNLOAD_CACHE_MAX_BYTES = Config.DOWNLOAD_CACHE_MAX_BYTES
+ALLOWED_EXTENSIONS = Config.ALLOWED_EXTENSIONS
 
 # Ensure upload and download directories exist
-os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(Config.DOWNLOAD_FOLDER, exist_ok=True)
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+os.makedirs(DOWNLOAD_CACHE_FOLDER, exist_ok=True)
+
+def split_filename(filename):
+    """Sanitize an uploaded filename and return it with its lower-cased extension"""
+    filename = secure_filename(filename)
+    _, dot, extension = filename.rpartition('.')
+    return filename, extension.lower() if dot else ''
 
-def allowed_file(filename):
-    return '.' in filename
+def allowed_file(filename, extension):
+    # Any extension passes unless ALLOWED_EXTENSIONS is configured
+    return '.' in filename and (not ALLOWED_EXTENSIONS or extension in ALLOWED_EXTENSIONS)
 
 @app.route('/')
 def index():
@@ -260,64 +559,159 @@ def index():
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    if 'file' not in request.files:
+    # Parse the multipart body ourselves; Werkzeug's parser is CPU-bound on large uploads
+    file_target = SpooledFileTarget()
+    uploader_target = ValueTarget(validator=MaxSizeValidator(Config.MAX_UPLOADER_BYTES))
+    try:
+        parser = StreamingFormDataParser(headers=request.headers)
+    except ParseFailedException:
+        # Not a multipart form at all, so there is no file in it
+        file_target.file.close()
         flash('No file selected')
         return redirect(url_for('index'))
+    parser.register('file', file_target)
+    parser.register('uploader', uploader_target)
+    
+    with file_target.file:
+        try:
+            while chunk := request.stream.read(65536):
+                parser.data_received(chunk)
+        except ValidationError:
+            flash('Uploader name is too long')
+            return redirect(url_for('index'))
+        except Exception as e:
+            flash(f'Error uploading file: {str(e)}')
+            return redirect(url_for('index'))
+        
+        if not file_target.multipart_filename:
+            flash('No file selected')
+            return redirect(url_for('index'))
+        
+        filename, extension = split_filename(file_target.multipart_filename)
+        if allowed_file(file_target.multipart_filename, extension):
+            return store_upload(file_target.file, filename, extension,
+                                uploader_target.value.decode('utf-8', 'replace') or 'anonymous',
+                                file_target.size)
+    
+    flash('Invalid file type')
+    return redirect(url_for('index'))
+
+def store_upload(stream, filename, extension, uploader, size):
+    """
+    Push an uploaded file stream to IPFS and record its metadata on the blockchain
+    """
+    try:
+        # Stream the upload straight to IPFS, counting bytes on the way
+        reader = CountingReader(stream, size)
+        ipfs_result = ipfs_client.add_stream(reader, filename)
+        if not ipfs_result:
+            flash('Failed to upload to IPFS. Make sure IPFS daemon is running.')
+            return redirect(url_for('index'))
+        
+        ipfs_hash = ipfs_result['Hash']
+        new_block = record_upload(filename, extension, ipfs_hash, reader.bytes_read, uploader)
+        
+        return render_template('success.html', 
+                             ipfs_hash=ipfs_hash,
+                             filename=filename,
+                             block_index=new_block.index)
+        
+    except Exception as e:
+        flash(f'Error uploading file: {str(e)}')
+        return redirect(url_for('index'))
+
+def record_upload(filename, extension, ipfs_hash, file_size, uploader):
+    """
+    Add a block recording a file that has been stored on IPFS
+    """
+    # One clock read for both the metadata and the block; isoformat(' ') matches str(datetime)
+    now = datetime.now()
+    
+    # Prepare metadata for blockchain
+    file_metadata = {
+        "filename": filename,
+        "file_extension": extension,
+        "file_size": file_size,
+        "ipfs_hash": ipfs_hash,
+        "timestamp": now.isoformat(' '),
+        "uploader": uploader
+    }
     
-    file = request.files['file']
-    if file.filename == '':
+    # Add to blockchain
+    new_block = Block(
+        index=len(blockchain.chain),
+        timestamp=now,
+        data=file_metadata,
+        previous_hash=blockchain.get_latest_block().hash
+    )
+    
+    blockchain.add_block(new_block)
+    return new_block
+
+@app.route('/batch-upload', methods=['POST'])
+def batch_upload():
+    """
+    Store several files posted under the 'file' field with one IPFS /add request
+    """
+    files_target = SpooledFilesTarget(Config.MAX_BATCH_FILES)
+    uploader_target = ValueTarget(validator=MaxSizeValidator(Config.MAX_UPLOADER_BYTES))
+    try:
+        parser = StreamingFormDataParser(headers=request.headers)
+    except ParseFailedException:
         flash('No file selected')
         return redirect(url_for('index'))
+    parser.register('file', files_target)
+    parser.register('uploader', uploader_target)
     
-    if file and allowed_file(file.filename):
+    with closing(files_target):
         try:
-            # Save file temporarily
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(Config.UPLOAD_FOLDER, filename)
-            file.save(file_path)
-            
-            # Upload to IPFS
-            ipfs_result = ipfs_client.add(file_path)
-            if not ipfs_result:
+            while chunk := request.stream.read(65536):
+                parser.data_received(chunk)
+        except TooManyFilesError as e:
+            flash(str(e))
+            return redirect(url_for('index'))
+        except ValidationError:
+            flash('Uploader name is too long')
+            return redirect(url_for('index'))
+        except Exception as e:
+            flash(f'Error uploading files: {str(e)}')
+            return redirect(url_for('index'))
+        
+        uploads = [part for part in files_target.parts if part.multipart_filename]
+        if not uploads:
+            flash('No file selected')
+            return redirect(url_for('index'))
+        
+        accepted = []
+        for upload in uploads:
+            filename, extension = split_filename(upload.multipart_filename)
+            if allowed_file(upload.multipart_filename, extension):
+                accepted.append((upload, filename, extension))
+        skipped = len(uploads) - len(accepted)
+        if not accepted:
+            flash('Invalid file type')
+            return redirect(url_for('index'))
+        
+        uploader = uploader_target.value.decode('utf-8', 'replace') or 'anonymous'
+        try:
+            readers = [CountingReader(upload.file, upload.size) for upload, _, _ in accepted]
+            ipfs_results = ipfs_client.add_many(
+                [(filename, reader) for (_, filename, _), reader in zip(accepted, readers)])
+            if not ipfs_results or len(ipfs_results) != len(readers):
                 flash('Failed to upload to IPFS. Make sure IPFS daemon is running.')
                 return redirect(url_for('index'))
             
-            ipfs_hash = ipfs_result['Hash']
-            
-            # Prepare metadata for blockchain
-            file_metadata = {
-                "filename": filename,
-                "file_extension": filename.rsplit('.', 1)[1].lower() if '.' in filename else '',
-                "file_size": os.path.getsize(file_path),
-                "ipfs_hash": ipfs_hash,
-                "timestamp": str(datetime.now()),
-                "uploader": request.form.get('uploader', 'anonymous')
-            }
-            
-            # Add to blockchain
-            new_block = Block(
-                index=len(blockchain.chain),
-                timestamp=datetime.now(),
-                data=file_metadata,
-                previous_hash=blockchain.get_latest_block().hash
-            )
-            
-            blockchain.add_block(new_block)
-            
-            # Clean up temporary file
-            os.remove(file_path)
-            
-            return render_template('success.html', 
-                                 ipfs_hash=ipfs_hash,
-                                 filename=filename,
-                                 block_index=new_block.index)
+            for (_, filename, extension), reader, ipfs_result in zip(accepted, readers, ipfs_results):
+                record_upload(filename, extension, ipfs_result['Hash'], reader.bytes_read, uploader)
             
         except Exception as e:
-            flash(f'Error uploading file: {str(e)}')
+            flash(f'Error uploading files: {str(e)}')
             return redirect(url_for('index'))
     
-    flash('Invalid file type')
-    return redirect(url_for('index'))
+    flash(f'Uploaded {len(accepted)} file(s) to IPFS and the blockchain')
+    if skipped:
+        flash(f'Skipped {skipped} file(s) with an invalid file type')
+    return redirect(url_for('list_files'))
 
 @app.route('/download', methods=['GET', 'POST'])
 def download_file():
@@ -335,35 +729,28 @@ def download_file():
                 flash('Error: This IPFS hash is not registered in the blockchain')
                 return redirect(url_for('download_file'))
             
-            # Download from IPFS
-            ipfs_file_path = ipfs_client.get(ipfs_hash, Config.DOWNLOAD_FOLDER)
-            if not ipfs_file_path:
+            # Content is immutable per hash, so a saved copy can be served as-is with
+            # sendfile(2) via the server's wsgi.file_wrapper
+            cached_path = safe_join(DOWNLOAD_CACHE_FOLDER, ipfs_hash) if DOWNLOAD_CACHE_MAX_BYTES else None
+            if cached_path and os.path.isfile(cached_path):
+                return send_file(os.path.abspath(cached_path),
+                                 as_attachment=True,
+                                 download_name=file_data['filename'],
+                                 conditional=True)
+            
+            # Otherwise stream straight from IPFS to the client, saving a copy for next time
+            # unless it could never fit in the cache or something else is in the way
+            chunks = ipfs_client.get_stream(ipfs_hash)
+            if chunks is None:
                 flash('Error: File not found on IPFS network')
                 return redirect(url_for('download_file'))
+            if (cached_path and not os.path.lexists(cached_path)
+                    and file_data['file_size'] <= DOWNLOAD_CACHE_MAX_BYTES):
+                chunks = CachingIterator(chunks, cached_path, DOWNLOAD_CACHE_MAX_BYTES)
             
-            # The file will be saved with the IPFS hash as filename
-            # Rename file to original name
-            original_filename = file_data['filename']
-            download_path = os.path.join(Config.DOWNLOAD_FOLDER, original_filename)
-            
-            if os.path.exists(ipfs_file_path):
-                # Copy the file to preserve the original in IPFS folder
-                import shutil
-                shutil.copy2(ipfs_file_path, download_path)
-                
-                # Simple file existence check instead of hash comparison
-                if os.path.exists(download_path) and os.path.getsize(download_path) > 0:
-                    return send_file(
-                        download_path,
-                        as_attachment=True,
-                        download_name=original_filename
-                    )
-                else:
-                    flash('Error: Downloaded file is empty or could not be saved')
-                    return redirect(url_for('download_file'))
-            else:
-                flash('Error: File could not be retrieved from IPFS')
-                return redirect(url_for('download_file'))
+            response = Response(chunks, mimetype='application/octet-stream')
+            response.headers.set('Content-Disposition', 'attachment', filename=file_data['filename'])
+            return response
                 
         except Exception as e:
             flash(f'Error downloading file: {str(e)}')
@@ -376,25 +763,38 @@ def list_files():
     files = blockchain.get_all_files()
     return render_template('files.html', files=files)
 
+# Rendered /blockchain page, paired with the chain view it was rendered from.
+# Blockchain hands out a new view whenever the chain changes, so an identity
+# check is enough to tell when the page is stale.
+_blockchain_page = {'current': (None, None)}
+
 @app.route('/blockchain')
 def view_blockchain():
     chain_data = blockchain.to_dict()
-    return render_template('blockchain.html', chain=chain_data)
+    rendered_from, page = _blockchain_page['current']
+    if rendered_from is not chain_data:
+        page = render_template('blockchain.html', chain=chain_data)
+        _blockchain_page['current'] = (chain_data, page)
+    return page
 
 @app.route('/verify')
 def verify_chain():
     is_valid, errors, details = blockchain.validate_chain()
     return render_template('verify.html', is_valid=is_valid, errors=errors, details=details)
 
+def cached_json_response(body, etag):
+    """Serve pre-encoded JSON, answering repeat polls with 304 Not Modified"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
 @app.route('/api/files', methods=['GET'])
 def api_list_files():
-    files = blockchain.get_all_files()
-    return jsonify(files)
+    return cached_json_response(*blockchain.files_to_json())
 
 @app.route('/api/blockchain', methods=['GET'])
 def api_blockchain():
-    chain_data = blockchain.to_dict()
-    return jsonify(chain_data)
+    return cached_json_response(*blockchain.to_json())
 
 # File Distribution Route - UPDATED WITH ERROR HANDLING
 @app.route('/file-distribution/<ipfs_hash>')
@@ -409,15 +809,17 @@ def file_distribution(ipfs_hash):
             flash('File not found in blockchain')
             return redirect(url_for('list_files'))
         
-        # Check IPFS status first
+        # Get distribution data from IPFS in the background - THIS WILL NEVER FAIL NOW
+        distribution_future = ipfs_executor.submit(ipfs_client.get_file_distribution, ipfs_hash)
+        
+        # Check IPFS status while the distribution lookup is in flight
         ipfs_status = ipfs_client.check_ipfs_status()
-        print(f"IPFS Status: {ipfs_status}")
+        logger.debug("IPFS Status: %s", ipfs_status)
         
-        # Get distribution data from IPFS - THIS WILL NEVER FAIL NOW
-        distribution_data = ipfs_client.get_file_distribution(ipfs_hash)
+        distribution_data = distribution_future.result()
         
-        # DEBUG: Print distribution data to see what's happening
-        print(f"Distribution data: {distribution_data}")
+        # DEBUG: Log distribution data to see what's happening
+        logger.debug("Distribution data: %s", distribution_data)
         
         return render_template('file_distribution.html',
                              file_data=file_data,
@@ -426,7 +828,7 @@ def file_distribution(ipfs_hash):
                              ipfs_hash=ipfs_hash)
                              
     except Exception as e:
-        print(f"Unexpected error in file_distribution route: {e}")
+        logger.exception("Unexpected error in file_distribution route: %s", e)
         # Even if everything fails, show a basic distribution page
         file_data = blockchain.get_file_by_hash(ipfs_hash)
         if file_data:
@@ -477,11 +879,12 @@ def demo_tamper_block():
     # Ensure we have enough blocks to demonstrate
     if len(blockchain.chain) <= 1:
         # Add some demo files if blockchain is empty
+        now = datetime.now()
         demo_files = [
             {
                 "filename": "research_paper.pdf", 
                 "ipfs_hash": "QmResearchPaper123", 
-                "timestamp": str(datetime.now()),
+                "timestamp": now.isoformat(' '),
                 "file_size": 2048000,
                 "uploader": "professor_smith",
                 "file_extension": "pdf"
@@ -489,7 +892,7 @@ def demo_tamper_block():
             {
                 "filename": "project_data.xlsx", 
                 "ipfs_hash": "QmProjectData456", 
-                "timestamp": str(datetime.now()),
+                "timestamp": now.isoformat(' '),
                 "file_size": 1024000,
                 "uploader": "student_john",
                 "file_extension": "xlsx"
@@ -499,7 +902,7 @@ def demo_tamper_block():
         for file_data in demo_files:
             block = Block(
                 index=len(blockchain.chain),
-                timestamp=datetime.now(),
+                timestamp=now,
                 data=file_data,
                 previous_hash=blockchain.get_latest_block().hash
             )
@@ -532,6 +935,8 @@ def demo_tamper_block():
         
         target_block.hash = "0000TAMPERED_HASH_DEMO"
         
+        blockchain.invalidate_cache()
+        
         flash(f'Demo: Block #{target_block.index} tampered! Changed "{original_filename}" to "malicious_software.exe"')
     
     return redirect(url_for('verify_chain'))
@@ -553,6 +958,7 @@ def demo_corrupt_chain():
             
             # Apply temporary corruption
             tamper_block.previous_hash = "BROKEN_CHAIN_LINK_123"
+            blockchain.invalidate_cache()
             
             flash('Demo: Blockchain chain broken! Previous hash reference corrupted.')
     
@@ -573,6 +979,7 @@ def demo_invalid_pow():
         
         # Apply temporary invalid hash
         tamper_block.hash = "000INVALID_POW_HASH"
+        blockchain.invalidate_cache()
         
         flash('Demo: Invalid proof-of-work detected! Hash does not meet difficulty requirement.')
     
@@ -601,6 +1008,7 @@ def demo_reset():
             if hasattr(block, 'original_demo_previous_hash'):
                 block.previous_hash = block.original_demo_previous_hash
                 delattr(block, 'original_demo_previous_hash')
+        blockchain.invalidate_cache()
         
         # If we have a stored original chain, restore it (but preserve user files)
         if hasattr(blockchain, 'original_chain_state'):
@@ -622,17 +1030,23 @@ def demo_reset():
                 new_chain.append(block)
             
             blockchain.chain = new_chain
+            blockchain.invalidate_cache()
             
-            # Re-add user files that were uploaded after demo started
+            # Re-add user files that were uploaded after demo started; metadata values
+            # are flat, so each record's items make a hashable key for one set lookup
+            existing_files = {frozenset(block.data.items()) for block in blockchain.chain if 'filename' in block.data}
+            now = datetime.now()
             for file_data in user_files:
-                if file_data not in [block.data for block in blockchain.chain if 'filename' in block.data]:
+                file_key = frozenset(file_data.items())
+                if file_key not in existing_files:
                     block = Block(
                         index=len(blockchain.chain),
-                        timestamp=datetime.now(),
+                        timestamp=now,
                         data=file_data,
                         previous_hash=blockchain.get_latest_block().hash
                     )
                     blockchain.add_block(block)
+                    existing_files.add(file_key)
             
             delattr(blockchain, 'original_chain_state')
         
@@ -641,6 +1055,7 @@ def demo_reset():
     except Exception as e:
         flash(f'Reset completed with note: {str(e)}')
     
+    blockchain.invalidate_cache()
     return redirect(url_for('verify_chain'))
 
 # File Delete Route - HARD DELETE
@@ -672,4 +1087,4 @@ def delete_file():
     return redirect(url_for('list_files'))
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    app.run(debug=Config.DEBUG, host='0.0.0.0', port=5001)
\ No newline at end of file
@@ -0,0 +1,8 @@
+# ASGI entry point so the app can be served by Uvicorn:
+#   uvicorn asgi:asgi_app --host 0.0.0.0 --port 5001
+# a2wsgi runs each request on a worker thread pool, so requests blocked on
+# the IPFS daemon don't hold up the others.
+from a2wsgi import WSGIMiddleware
+from app import app
+
+asgi_app = WSGIMiddleware(app)
@@ -1,10 +1,24 @@
 import hashlib
 import json
+import os
 import time
+import threading
+import multiprocessing
+import orjson
 from datetime import datetime
 from config import Config
 
+# The C string encoder json.dumps applies to str values (ensure_ascii=True)
+_json_string = json.encoder.encode_basestring_ascii
+
+def _json_number(value):
+    # json.dumps output for a number, without its per-call encoder setup for plain ints
+    return int.__repr__(value) if type(value) is int else json.dumps(value)
+
 class Block:
+    # Fields that feed calculate_hash(); assigning any of them drops the memoized hash
+    HASHED_FIELDS = frozenset(("index", "timestamp", "data", "previous_hash", "nonce"))
+    
     def __init__(self, index, timestamp, data, previous_hash, nonce=0):
         self.index = index
         self.timestamp = timestamp
@@ -13,15 +27,45 @@ class Block:
         self.nonce = nonce
         self.hash = self.calculate_hash()
     
+    def __setattr__(self, name, value):
+        if name in Block.HASHED_FIELDS:
+            object.__setattr__(self, "_cached_hash", None)
+            # The serialized header excludes the nonce, so a new nonce keeps it
+            if name != "nonce":
+                object.__setattr__(self, "_header", None)
+            if name == "data":
+                object.__setattr__(self, "_data_json", None)
+        object.__setattr__(self, name, value)
+    
     def calculate_hash(self):
-        block_string = json.dumps({
-            "index": self.index,
-            "timestamp": str(self.timestamp),
-            "data": self.data,
-            "previous_hash": self.previous_hash,
-            "nonce": self.nonce
-        }, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        """
+        Hash of the block contents, memoized until a hashed field is reassigned.
+        Mutating self.data in place is not tracked; assign a new dict instead.
+        """
+        if self._cached_hash is None:
+            prefix, suffix = self.header_parts()
+            block_string = prefix + _json_number(self.nonce).encode() + suffix
+            self._cached_hash = hashlib.sha256(block_string).hexdigest()
+        return self._cached_hash
+    
+    def header_parts(self):
+        """
+        The hashed serialization split around the nonce, so that
+        sha256(prefix + str(nonce).encode() + suffix) matches calculate_hash()
+        """
+        # Same bytes as json.dumps({index, timestamp, data, previous_hash, nonce},
+        # sort_keys=True), written out field by field so the encoded data, the
+        # largest part, is reused until self.data is reassigned. The parts are kept
+        # until a field other than the nonce changes, so the timestamp is formatted
+        # once rather than on every hash.
+        if self._header is None:
+            if self._data_json is None:
+                self._data_json = json.dumps(self.data, sort_keys=True)
+            prefix = f'{{"data": {self._data_json}, "index": {_json_number(self.index)}, "nonce": '
+            suffix = (f', "previous_hash": {_json_string(self.previous_hash)}, '
+                      f'"timestamp": {_json_string(str(self.timestamp))}}}')
+            self._header = (prefix.encode(), suffix.encode())
+        return self._header
     
     def to_dict(self):
         return {
@@ -47,10 +91,68 @@ class Block:
         self.hash = snapshot['hash']
         self.previous_hash = snapshot['previous_hash']
 
+def sha256_backend():
+    """Describe the SHA-256 implementation behind hashlib, for the startup log"""
+    if hashlib.sha256.__name__.startswith("openssl_"):
+        import ssl
+        backend = ssl.OPENSSL_VERSION
+    else:
+        backend = "CPython builtin (no OpenSSL)"
+    
+    # OpenSSL picks SHA-NI at runtime when the CPU advertises it
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            flags = next((line.split() for line in cpuinfo if line.startswith("flags")), [])
+        sha_ni = "yes" if "sha_ni" in flags else "no"
+    except OSError:
+        sha_ni = "unknown"
+    return f"{backend}, CPU SHA extensions: {sha_ni}"
+
+def _search_nonce(prefix, suffix, difficulty, start, stride=1, stop=None):
+    """
+    Try nonces start, start + stride, ... and return the first (nonce, digest)
+    that meets the difficulty, or None once stop is set
+    """
+    # The bytes before the nonce are absorbed once; each trial resumes from a
+    # copy of that SHA-256 state and formats the nonce and suffix in one step
+    copy_prefix_state = hashlib.sha256(prefix).copy
+    tail_template = b"%d" + suffix.replace(b"%", b"%%")
+    
+    # A digest has `difficulty` leading zero hex digits exactly when, read as a
+    # big-endian number, it is below 2**(256 - 4 * difficulty). Equal-length bytes
+    # compare in that same order, so one C-level comparison tests the target.
+    if difficulty > 0:
+        limit = (1 << (256 - 4 * difficulty)).to_bytes(32, "big")
+    else:
+        limit = b"\xff" * 33  # Above every 32-byte digest
+    
+    batch = 4096 * stride
+    while stop is None or not stop.is_set():
+        for nonce in range(start, start + batch, stride):
+            trial = copy_prefix_state()
+            trial.update(tail_template % nonce)
+            digest = trial.digest()
+            if digest < limit:
+                return nonce, digest
+        start += batch
+    return None
+
+def _mining_worker(prefix, suffix, difficulty, start, stride, stop, results):
+    found = _search_nonce(prefix, suffix, difficulty, start, stride, stop)
+    if found is not None:
+        results.put(found)
+
 class Blockchain:
     def __init__(self):
         self.chain = [self.create_genesis_block()]
         self.difficulty = Config.DIFFICULTY
+        self.mining_workers = Config.MINING_WORKERS or os.cpu_count() or 1
+        # Derived views of the chain (dicts, file lists, JSON), rebuilt lazily after changes
+        self._cache = {}
+        # ipfs_hash -> first block that references it; None means rebuild on next lookup
+        self._by_hash = {}
+        # Serializes chain changes and cache rebuilds across request threads
+        self._lock = threading.RLock()
     
     def create_genesis_block(self):
         return Block(0, datetime.now(), {"message": "Genesis Block"}, "0")
@@ -59,30 +161,90 @@ class Blockchain:
         return self.chain[-1]
     
     def add_block(self, new_block):
-        new_block.previous_hash = self.get_latest_block().hash
-        new_block.hash = new_block.calculate_hash()
-        self.mine_block(new_block)
-        self.chain.append(new_block)
-        return new_block
+        # Linking, mining and appending must see the same tip, so only one block at a time
+        with self._lock:
+            # Callers usually link the block already; reassigning would drop its memoized hash.
+            # Another thread may have added a block since the caller read the tip.
+            latest_hash = self.get_latest_block().hash
+            if new_block.previous_hash != latest_hash:
+                new_block.previous_hash = latest_hash
+            if new_block.index != len(self.chain):
+                new_block.index = len(self.chain)
+            new_block.hash = new_block.calculate_hash()
+            self.mine_block(new_block)
+            self.chain.append(new_block)
+            
+            # Extend the cached views with the new block rather than rebuilding them from
+            # the whole chain; fresh lists keep views handed out earlier unchanged
+            chain_view = self._cache.get('chain')
+            files_view = self._cache.get('files')
+            self._cache.clear()
+            if chain_view is not None:
+                self._cache['chain'] = chain_view + [new_block.to_dict()]
+            if files_view is not None:
+                self._cache['files'] = files_view + [new_block.data] if 'filename' in new_block.data else files_view
+            if self._by_hash is not None and 'ipfs_hash' in new_block.data:
+                self._by_hash.setdefault(new_block.data['ipfs_hash'], new_block)
+            return new_block
+    
+    def invalidate_cache(self):
+        """Drop cached views; call after mutating blocks or the chain directly"""
+        with self._lock:
+            self._cache.clear()
+            self._by_hash = None
     
     def mine_block(self, block):
         target = "0" * self.difficulty
-        while block.hash[:self.difficulty] != target:
-            block.nonce += 1
-            block.hash = block.calculate_hash()
+        if block.hash[:self.difficulty] == target:
+            return
+        
+        # Serialize the header once and splice in each nonce, instead of re-running
+        # json.dumps for every trial
+        prefix, suffix = block.header_parts()
+        if self.mining_workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            nonce, digest = self._mine_parallel(prefix, suffix, block.nonce + 1)
+        else:
+            nonce, digest = _search_nonce(prefix, suffix, self.difficulty, block.nonce + 1)
+        
+        block.nonce = nonce
+        block.hash = block._cached_hash = digest.hex()
+    
+    def _mine_parallel(self, prefix, suffix, start):
+        """Split the nonce search across worker processes, interleaving their nonces"""
+        workers = self.mining_workers
+        ctx = multiprocessing.get_context("fork")
+        stop = ctx.Event()
+        results = ctx.SimpleQueue()
+        processes = [
+            ctx.Process(target=_mining_worker, daemon=True,
+                        args=(prefix, suffix, self.difficulty, start + k, workers, stop, results))
+            for k in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            while results.empty():
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    raise RuntimeError("Mining workers exited without finding a nonce")
+                time.sleep(0.005)
+            return results.get()
+        finally:
+            stop.set()
+            for process in processes:
+                process.join()
     
     def is_chain_valid(self):
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
-            
+        difficulty = self.difficulty
+        target = "0" * difficulty
+        chain = self.chain
+        for previous_block, current_block in zip(chain, chain[1:]):
             if current_block.hash != current_block.calculate_hash():
                 return False
             
             if current_block.previous_hash != previous_block.hash:
                 return False
             
-            if current_block.hash[:self.difficulty] != "0" * self.difficulty:
+            if current_block.hash[:difficulty] != target:
                 return False
         
         return True
@@ -114,9 +276,10 @@ class Blockchain:
             })
         
         # Check subsequent blocks
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
+        difficulty = self.difficulty
+        target = "0" * difficulty
+        chain = self.chain
+        for previous_block, current_block in zip(chain, chain[1:]):
             block_issues = []
             
             if current_block.index != previous_block.index + 1:
@@ -128,8 +291,8 @@ class Blockchain:
             if current_block.hash != current_block.calculate_hash():
                 block_issues.append("Block's hash doesn't match its calculated hash")
             
-            if current_block.hash[:self.difficulty] != "0" * self.difficulty:
-                block_issues.append(f"Proof-of-work invalid: Hash doesn't start with {self.difficulty} zeros")
+            if current_block.hash[:difficulty] != target:
+                block_issues.append(f"Proof-of-work invalid: Hash doesn't start with {difficulty} zeros")
             
             if block_issues:
                 errors.append(f"Block {current_block.index} has issues")
@@ -151,46 +314,83 @@ class Blockchain:
         return is_valid, errors, details
     
     def get_file_by_hash(self, ipfs_hash):
-        for block in self.chain:
-            if 'ipfs_hash' in block.data and block.data['ipfs_hash'] == ipfs_hash:
-                return block.data
-        return None
+        by_hash = self._by_hash
+        if by_hash is None:
+            # Rebuild under the lock so a block added meanwhile can't be left out
+            with self._lock:
+                if self._by_hash is None:
+                    by_hash = {}
+                    for block in self.chain:
+                        if 'ipfs_hash' in block.data:
+                            by_hash.setdefault(block.data['ipfs_hash'], block)
+                    self._by_hash = by_hash
+                by_hash = self._by_hash
+        block = by_hash.get(ipfs_hash)
+        return block.data if block else None
     
     def get_all_files(self):
-        files = []
-        for block in self.chain:
-            if 'filename' in block.data:
-                files.append(block.data)
+        files = self._cache.get('files')
+        if files is None:
+            with self._lock:
+                if 'files' not in self._cache:
+                    self._cache['files'] = [block.data for block in self.chain if 'filename' in block.data]
+                files = self._cache['files']
         return files
     
     def to_dict(self):
-        return [block.to_dict() for block in self.chain]
+        chain = self._cache.get('chain')
+        if chain is None:
+            with self._lock:
+                if 'chain' not in self._cache:
+                    self._cache['chain'] = [block.to_dict() for block in self.chain]
+                chain = self._cache['chain']
+        return chain
+    
+    def to_json(self):
+        """Serialized chain as (JSON bytes, ETag), cached until the chain changes"""
+        return self._cached_json('chain_json', self.to_dict)
+    
+    def files_to_json(self):
+        """Serialized file list as (JSON bytes, ETag), cached until the chain changes"""
+        return self._cached_json('files_json', self.get_all_files)
+    
+    def _cached_json(self, key, build):
+        cached = self._cache.get(key)
+        if cached is None:
+            with self._lock:
+                if key not in self._cache:
+                    body = orjson.dumps(build())
+                    self._cache[key] = (body, hashlib.sha1(body).hexdigest())
+                cached = self._cache[key]
+        return cached
     
     def remove_file_by_hash(self, ipfs_hash):
         """
         Remove a file block from the blockchain (hard delete)
         This maintains chain integrity by recalculating hashes
         """
-        # Find the block to remove
-        block_to_remove = None
-        block_index = -1
-        
-        for i, block in enumerate(self.chain):
-            if i > 0 and 'ipfs_hash' in block.data and block.data['ipfs_hash'] == ipfs_hash:
-                block_to_remove = block
-                block_index = i
-                break
-        
-        if block_to_remove is None:
-            return False
-        
-        # Remove the block from the chain
-        self.chain.pop(block_index)
-        
-        # Rebuild the chain from the removed block onward to maintain integrity
-        self._rebuild_chain_from(block_index)
-        
-        return True
+        with self._lock:
+            # Find the block to remove
+            block_to_remove = None
+            block_index = -1
+            
+            for i, block in enumerate(self.chain):
+                if i > 0 and 'ipfs_hash' in block.data and block.data['ipfs_hash'] == ipfs_hash:
+                    block_to_remove = block
+                    block_index = i
+                    break
+            
+            if block_to_remove is None:
+                return False
+            
+            # Remove the block from the chain
+            self.chain.pop(block_index)
+            
+            # Rebuild the chain from the removed block onward to maintain integrity
+            self._rebuild_chain_from(block_index)
+            self.invalidate_cache()
+            
+            return True
     
     def _rebuild_chain_from(self, start_index):
         """
@@ -7,14 +7,28 @@ class Config:
     # IPFS Configuration
     IPFS_HOST = os.getenv('IPFS_HOST', '127.0.0.1')
     IPFS_PORT = int(os.getenv('IPFS_PORT', 5001))
+    IPFS_MAX_CONCURRENCY = int(os.getenv('IPFS_MAX_CONCURRENCY', 8))  # Simultaneous add/get transfers
     
     # Blockchain Configuration
     DIFFICULTY = int(os.getenv('DIFFICULTY', 4))  # Number of leading zeros required for PoW
+    MINING_WORKERS = int(os.getenv('MINING_WORKERS', 1))  # Processes searching nonces; 0 = one per CPU
     
     # File Storage
     UPLOAD_FOLDER = 'uploads'
     DOWNLOAD_FOLDER = 'downloads'
+    # Disk space for saved copies of downloads, oldest evicted first; 0 streams every download from IPFS
+    DOWNLOAD_CACHE_MAX_BYTES = int(os.getenv('DOWNLOAD_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024 * 1024  # 16GB max file size
+    MAX_UPLOADER_BYTES = 256  # Longest uploader name stored in a block
+    MAX_BATCH_FILES = int(os.getenv('MAX_BATCH_FILES', 100))  # Files accepted by one /batch-upload request
+    # Comma-separated extensions accepted for upload, e.g. "pdf,png,txt"; empty allows any
+    ALLOWED_EXTENSIONS = frozenset(
+        ext.strip().lower() for ext in os.getenv('ALLOWED_EXTENSIONS', '').split(',') if ext.strip()
+    )
+    
+    # Flask - keep debug (and per-render template reload checks) off unless asked for
+    DEBUG = os.getenv('FLASK_DEBUG', '0') == '1'
+    TEMPLATES_AUTO_RELOAD = DEBUG
     
     # Security
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
\ No newline at end of file
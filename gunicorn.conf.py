@@ -0,0 +1,10 @@
+# Gunicorn settings, picked up automatically by running `gunicorn`.
+# The blockchain lives in process memory, so run a single worker and let
+# gevent greenlets provide the concurrency for IPFS-bound requests. The
+# gevent worker monkey-patches sockets before the app is imported, so
+# requests and the IPFS client cooperate with the event loop.
+wsgi_app = 'wsgi:application'
+bind = '0.0.0.0:5001'
+workers = 1
+worker_class = 'gevent'
+worker_connections = 1000